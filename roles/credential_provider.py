@@ -0,0 +1,226 @@
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=line-too-long,too-few-public-methods
+"""
+# Summary
+
+Pluggable credential resolution for the dynamic inventory scripts.
+
+All secrets needed for a run are resolved in one batched call to the
+selected backend, and cached in memory for the life of the process.
+
+## Limitations
+
+The cache is per-process.  Ansible runs the inventory script once per
+ansible-playbook invocation, so each run fetches secrets exactly once,
+and a rotated secret is picked up by the next run.  Nothing is shared
+between runs.
+
+## Usage
+
+```bash
+export ND_CREDENTIAL_PROVIDER=env       # env (default), file, command, or fake
+export ND_CREDENTIAL_FILE=~/.nd_secrets # file: KEY=VALUE lines
+export ND_CREDENTIAL_COMMAND=my-secrets # command: called once with all names as arguments
+```
+
+### env
+
+Secrets are read from environment variables of the same name
+e.g. ND_PASSWORD.  This is the historical behavior.
+
+### file
+
+Secrets are read from a KEY=VALUE file (blank lines, comments and a leading
+"export " are ignored), so that passwords need not be exported in
+checked-in env files.
+
+```bash
+ND_PASSWORD=MyPassword
+NXOS_PASSWORD=MyPassword
+```
+
+### command
+
+ND_CREDENTIAL_COMMAND is run once, with the names of all needed secrets
+appended as arguments, and must print a JSON object mapping each name
+to its value.
+
+```bash
+my-secrets ND_PASSWORD NXOS_PASSWORD
+{"ND_PASSWORD": "MyPassword", "NXOS_PASSWORD": "MyPassword"}
+```
+
+### fake
+
+For tests.  Secrets are read from the JSON object in ND_CREDENTIAL_FAKE.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type  # pylint: disable=invalid-name
+__copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
+__author__ = "Allen Robel"
+
+import json
+import shlex
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from os import environ, path
+
+
+@dataclass
+class EnvCredentialProvider:
+    """Resolve secrets from environment variables of the same name."""
+
+    def fetch(self, names: tuple[str, ...]) -> dict[str, str]:
+        """Return the value of each name that is set."""
+        return {name: environ[name] for name in names if environ.get(name)}
+
+
+def _unquote(value: str) -> str:
+    """Remove one pair of matching surrounding quotes, if present."""
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+@dataclass
+class FileCredentialProvider:
+    """Resolve secrets from a KEY=VALUE file."""
+    filename: str
+
+    def fetch(self, names: tuple[str, ...]) -> dict[str, str]:
+        """Read the file once and return the value of each name it contains."""
+        values: dict[str, str] = {}
+        try:
+            with open(path.expanduser(self.filename), encoding="utf-8") as handle:
+                lines = handle.readlines()
+        except OSError as error:
+            raise ValueError(f"ND_CREDENTIAL_FILE must be a readable KEY=VALUE credential file.  Error detail: {error}") from error
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, _, value = line.removeprefix("export ").partition("=")
+            values[key.strip()] = _unquote(value.strip())
+        return {name: values[name] for name in names if values.get(name)}
+
+
+@dataclass
+class CommandCredentialProvider:
+    """Resolve secrets with one call to a local command that prints a JSON object."""
+    command: str
+    timeout: float = 30.0
+
+    def fetch(self, names: tuple[str, ...]) -> dict[str, str]:
+        """Run the command once for all names and return the values it prints."""
+        try:
+            result = subprocess.run(shlex.split(self.command) + list(names), capture_output=True, check=False, text=True, timeout=self.timeout)
+        except OSError as error:
+            raise ValueError(f"ND_CREDENTIAL_COMMAND must be an executable command.  Error detail: {error}") from error
+        except subprocess.TimeoutExpired as error:
+            raise ValueError(f"ND_CREDENTIAL_COMMAND must exit within {self.timeout} seconds.  Error detail: {error}") from error
+        if result.returncode != 0:
+            raise ValueError(f"ND_CREDENTIAL_COMMAND exited with status {result.returncode}: {result.stderr.strip()}")
+        try:
+            values = json.loads(result.stdout)
+        except ValueError as error:
+            raise ValueError(f"ND_CREDENTIAL_COMMAND must print a JSON object.  Error detail: {error}") from error
+        if not isinstance(values, dict):
+            raise ValueError(f"ND_CREDENTIAL_COMMAND must print a JSON object.  Got {type(values).__name__}")
+        return {name: str(values[name]) for name in names if values.get(name)}
+
+
+@dataclass
+class FakeCredentialProvider:
+    """Resolve secrets from a dict, counting fetches.  For tests."""
+    values: dict[str, str] = field(default_factory=dict)
+    fetches: int = 0
+
+    def fetch(self, names: tuple[str, ...]) -> dict[str, str]:
+        """Return the value of each name in values."""
+        self.fetches += 1
+        return {name: self.values[name] for name in names if self.values.get(name)}
+
+
+CredentialProvider = EnvCredentialProvider | FileCredentialProvider | CommandCredentialProvider | FakeCredentialProvider
+
+
+@dataclass
+class CredentialCache:
+    """
+    # Summary
+
+    In-memory cache in front of a credential provider.
+
+    Names that are not yet cached are fetched from the provider in a
+    single batch.  Names the provider cannot resolve are cached (as None)
+    too, so they are not fetched again.  Concurrent callers wait on one
+    fetch rather than each calling the provider.
+    """
+    provider: CredentialProvider
+    _values: dict[str, str | None] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def get(self, names: tuple[str, ...]) -> dict[str, str]:
+        """Return the value of each name the provider can resolve."""
+        with self._lock:
+            uncached = tuple(name for name in names if name not in self._values)
+            if uncached:
+                fetched = self.provider.fetch(uncached)
+                self._values.update({name: fetched.get(name) for name in uncached})
+            return {name: value for name in names if (value := self._values[name]) is not None}
+
+
+def provider_from_env() -> CredentialProvider:
+    """Return the credential provider selected by ND_CREDENTIAL_PROVIDER."""
+    provider = environ.get("ND_CREDENTIAL_PROVIDER", "env")
+    match provider:
+        case "env":
+            return EnvCredentialProvider()
+        case "file":
+            filename = environ.get("ND_CREDENTIAL_FILE")
+            if not filename:
+                raise ValueError("ND_CREDENTIAL_FILE environment variable must be set to the path of a KEY=VALUE credential file")
+            return FileCredentialProvider(filename)
+        case "command":
+            command = environ.get("ND_CREDENTIAL_COMMAND")
+            if not command:
+                raise ValueError("ND_CREDENTIAL_COMMAND environment variable must be set to a command that prints credentials as JSON")
+            return CommandCredentialProvider(command)
+        case "fake":
+            return FakeCredentialProvider(json.loads(environ.get("ND_CREDENTIAL_FAKE", "{}")))
+        case _:
+            raise ValueError(f"ND_CREDENTIAL_PROVIDER must be one of env, file, command, fake.  Got {provider}")
+
+
+_cache: CredentialCache | None = None
+_cache_lock = threading.Lock()
+
+
+def resolve_credentials(names: tuple[str, ...]) -> dict[str, str]:
+    """
+    # Summary
+
+    Resolve names with the provider selected by ND_CREDENTIAL_PROVIDER,
+    caching the result for the life of the process.
+    """
+    global _cache  # pylint: disable=global-statement
+    with _cache_lock:
+        if _cache is None:
+            _cache = CredentialCache(provider_from_env())
+    return _cache.get(names)
@@ -44,6 +44,17 @@ export NXOS_PASSWORD=MyPassword # Switch password
 export NXOS_USERNAME=admin      # Switch username
 ```
 
+### Credentials
+
+By default ND_PASSWORD and NXOS_PASSWORD are read from the
+environment.  To keep them out of env files, select another
+credential provider.  See credential_provider.py.
+
+```bash
+export ND_CREDENTIAL_PROVIDER=file        # env (default), file, command, or fake
+export ND_CREDENTIAL_FILE=~/.nd_secrets   # KEY=VALUE lines, for the file provider
+```
+
 ### Fabrics
 
 We can add more fabrics later as the need arises...
@@ -97,6 +108,55 @@ as above, but are lowercase, and remove the leading ND_.
 interface_1a - 1st interface on switch_1
 interface_1b - 2st interface on switch_1
 etc...
+
+#### Interface ranges
+
+All interfaces on a switch can instead be declared as a
+comma-separated list of ranges.
+
+ND_INTERFACE_[A]
+
+```bash
+export ND_INTERFACE_2=Ethernet1/1-48,Ethernet2/1-4
+```
+
+Ranges are stored as (module, start, end) tuples and only expanded
+into the interfaces hostvar of the switch that owns them (switch_2
+above, as assigned for ND_ROLE).  The legacy interface_[A][b]
+vars are computed from the ranges (interface_2a is Ethernet1/1,
+interface_2b is Ethernet1/2, etc.) unless ND_INTERFACE_[A][b] is
+also set.
+
+The owning switch must be in an inventory group, since Ansible
+ignores hostvars for hosts that are not.  Otherwise ValueError
+is raised.
+
+### Fabric groups
+
+Fabric group -> member fabric -> switch membership can be declared
+so that playbooks can target e.g. fabric_group_MCFG1_leaf (all leafs
+in fabric group MCFG1) without querying the controller.  Switches are
+referenced by their label (bgw_<n>, leaf_<n>, spine_<n>) and fabrics
+by theirs (fabric_<n>).
+
+```bash
+export ND_FABRIC_GROUP_1_MEMBERS=fabric_1,fabric_2
+export ND_FABRIC_1_SWITCHES=leaf_1,leaf_2,spine_1
+export ND_FABRIC_2_SWITCHES=leaf_3,leaf_4,bgw_1
+```
+
+Alternatively, set ND_TOPOLOGY_FILE to a JSON file describing a
+discovered topology.  See the _topology function.
+
+### Record/replay
+
+Set ND_REPLAY to run playbooks against a local nd_replay.py
+record/replay server instead of the controller.  See nd_replay.py.
+
+```bash
+export ND_REPLAY=127.0.0.1:8443  # nd_replay.py host:port
+export ND_REPLAY_USE_SSL=false   # true if nd_replay.py serves TLS
+```
 """
 
 from __future__ import absolute_import, division, print_function
@@ -106,9 +166,16 @@ __copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
 __author__ = "Allen Robel"
 
 import json
+import re
 from dataclasses import dataclass, field
+from functools import cache
 from os import environ
-from typing import Any
+from typing import Any, Iterator
+
+from credential_provider import resolve_credentials
+
+# Secrets resolved in one batched call to the credential provider at startup.
+CREDENTIAL_NAMES = ("ND_PASSWORD", "NXOS_PASSWORD")
 
 
 def _required(var_name, description) -> str:
@@ -118,6 +185,15 @@ def _required(var_name, description) -> str:
         raise ValueError(f"{var_name} environment variable must be set to {description}")
     return value
 
+
+def _credential(var_name, description) -> str:
+    """Get a required secret from the credential provider or raise ValueError."""
+    value = resolve_credentials(CREDENTIAL_NAMES).get(var_name)
+    if not value:
+        raise ValueError(f"{var_name} must be set to {description}.  See ND_CREDENTIAL_PROVIDER in credential_provider.py")
+    return value
+
+
 def _default_children() -> list[str]:
     children: list[str] = []
     children.extend(["bgw_1", "bgw_2", "bgw1", "bgw2"])
@@ -150,10 +226,46 @@ class ConfigNdConnection:
     network_os: str = "cisco.dcnm.dcnm"
     nd_domain: str = _required("ND_DOMAIN", "ND login domain e.g. 'local', 'radius', etc.")
     nd_ip4: str = _required("ND_IP4", "ND controller IP")
-    nd_password: str = _required("ND_PASSWORD", "ND controller password")
+    nd_password: str = _credential("ND_PASSWORD", "ND controller password")
     nd_username: str = environ.get("ND_USERNAME", "admin")
 
 
+@dataclass
+class ConfigNdReplay:
+    """
+    # Summary
+
+    Point the dcnm and ndfc groups at a local nd_replay.py record/replay
+    server instead of the controller.  Disabled unless ND_REPLAY is set.
+
+    - replay: ND_REPLAY, host:port of nd_replay.py e.g. 127.0.0.1:8443
+    - use_ssl: ND_REPLAY_USE_SSL, true if nd_replay.py serves TLS
+
+    ## See Also
+
+    nd_replay.py
+    """
+    replay: str = environ.get("ND_REPLAY", "")
+    use_ssl: bool = environ.get("ND_REPLAY_USE_SSL", "false").lower() == "true"
+
+    def __post_init__(self) -> None:
+        if not self.replay:
+            return
+        host, _, port = self.replay.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"ND_REPLAY environment variable must be set to host:port of nd_replay.py e.g. 127.0.0.1:8443.  Got {self.replay}")
+
+    @property
+    def host(self) -> str:
+        """nd_replay.py listen address."""
+        return self.replay.rpartition(":")[0]
+
+    @property
+    def port(self) -> int:
+        """nd_replay.py listen port."""
+        return int(self.replay.rpartition(":")[2])
+
+
 @dataclass
 class ConfigNxosConnection:
     """
@@ -172,7 +284,7 @@ class ConfigNxosConnection:
     become_method: str = "enable"
     connection: str = "ansible.netcommon.network_cli"
     network_os: str = "cisco.nxos.nxos"
-    nxos_password: str = _required("NXOS_PASSWORD", "NXOS switch password")
+    nxos_password: str = _credential("NXOS_PASSWORD", "NXOS switch password")
     nxos_username: str = environ.get("NXOS_USERNAME", "admin")
 
 
@@ -203,6 +315,86 @@ class ConfigTestFabricGroup:
     fabric_type_3: str = environ.get("ND_FABRIC_TYPE_3", "MCFG")
 
 
+InterfaceRange = tuple[str, int, int]
+
+
+def _parse_interface_ranges(value: str) -> tuple[InterfaceRange, ...]:
+    """
+    # Summary
+
+    Parse a comma-separated list of interfaces and interface ranges into
+    compact (module, start, end) tuples.
+
+    ## Example
+
+    "Ethernet1/1-48,Ethernet2/1-4,Ethernet3/1"
+    -> (("Ethernet1", 1, 48), ("Ethernet2", 1, 4), ("Ethernet3", 1, 1))
+    """
+    ranges: list[InterfaceRange] = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        match_ = re.fullmatch(r"(.+)/(\d+)(?:-(\d+))?", item)
+        if not match_:
+            raise ValueError(f"Invalid interface range {item}.  Expected e.g. Ethernet1/1 or Ethernet1/1-48")
+        start = int(match_.group(2))
+        end = int(match_.group(3) or start)
+        if end < start:
+            raise ValueError(f"Invalid interface range {item}.  End port is less than start port.")
+        ranges.append((match_.group(1), start, end))
+    return tuple(ranges)
+
+
+@cache
+def _interface_ranges() -> dict[int, tuple[InterfaceRange, ...]]:
+    """Return the interface ranges declared with ND_INTERFACE_<n>, keyed on switch number n."""
+    ranges: dict[int, tuple[InterfaceRange, ...]] = {}
+    for var_name, value in environ.items():
+        if match_ := re.fullmatch(r"ND_INTERFACE_(\d+)", var_name):
+            ranges[int(match_.group(1))] = _parse_interface_ranges(value)
+    return ranges
+
+
+def _expand_interfaces(ranges: tuple[InterfaceRange, ...]) -> Iterator[str]:
+    """Lazily expand (module, start, end) tuples into interface names."""
+    for module, start, end in ranges:
+        for port in range(start, end + 1):
+            yield f"{module}/{port}"
+
+
+def _nth_interface(ranges: tuple[InterfaceRange, ...], position: int) -> str | None:
+    """Return the interface at zero-based position within ranges, without expanding them."""
+    for module, start, end in ranges:
+        if position <= end - start:
+            return f"{module}/{start + position}"
+        position -= end - start + 1
+    return None
+
+
+def _interface(name: str, default: str) -> str:
+    """
+    # Summary
+
+    Resolve a legacy interface var e.g. interface_2b.
+
+    In order of precedence:
+
+    1. ND_INTERFACE_2b
+    2. The 2nd interface declared in ND_INTERFACE_2
+    3. default
+    """
+    suffix = name.removeprefix("interface_")
+    value = environ.get(f"ND_INTERFACE_{suffix}")
+    if value:
+        return value
+    switch, letter = int(suffix[:-1]), suffix[-1]
+    ranges = _interface_ranges().get(switch)
+    if ranges:
+        value = _nth_interface(ranges, ord(letter) - ord("a"))
+    return value or default
+
+
 @dataclass
 class ConfigTestInterface:
     """
@@ -217,11 +409,11 @@ class ConfigTestInterface:
     - interface_2b: vrf-lite capable
     - interface_3a
     """
-    interface_1a: str = environ.get("ND_INTERFACE_1a", "Ethernet1/1")
-    interface_1b: str = environ.get("ND_INTERFACE_1b", "Ethernet1/2")
-    interface_2a: str = environ.get("ND_INTERFACE_2a", "Ethernet1/1")
-    interface_2b: str = environ.get("ND_INTERFACE_2b", "Ethernet1/2")
-    interface_3a: str = environ.get("ND_INTERFACE_3a", "Ethernet1/3")
+    interface_1a: str = _interface("interface_1a", "Ethernet1/1")
+    interface_1b: str = _interface("interface_1b", "Ethernet1/2")
+    interface_2a: str = _interface("interface_2a", "Ethernet1/1")
+    interface_2b: str = _interface("interface_2b", "Ethernet1/2")
+    interface_3a: str = _interface("interface_3a", "Ethernet1/3")
 
 
 @dataclass
@@ -320,8 +512,174 @@ class ConfigTestVrf:
     vrf_2: str = environ.get("ND_VRF_2", "vrf-2")
 
 
+def _csv(var_name: str) -> list[str]:
+    """Get a comma-separated environment variable as a list, or an empty list if unset."""
+    return [item.strip() for item in environ.get(var_name, "").split(",") if item.strip()]
+
+
+def _fabric_name(label: str) -> str:
+    """Resolve a fabric label (fabric_1, fabric_2, ...) to its name.  Other values are returned unchanged."""
+    match_ = re.fullmatch(r"fabric_(\d+)", label)
+    if not match_:
+        return label
+    default = getattr(ConfigTestFabric(), label, None)
+    value = environ.get(f"ND_FABRIC_{match_.group(1)}", default)
+    if not value:
+        raise ValueError(f"ND_FABRIC_{match_.group(1)} environment variable must be set to the name of {label}")
+    return value
+
+
+def _declared_topology() -> dict[str, Any]:
+    """
+    # Summary
+
+    Build a topology from ND_FABRIC_GROUP_<n>_MEMBERS and ND_FABRIC_<n>_SWITCHES.
+
+    ## Example
+
+    ```bash
+    export ND_FABRIC_GROUP_1_MEMBERS=fabric_1,fabric_2
+    export ND_FABRIC_1_SWITCHES=leaf_1,leaf_2,spine_1
+    export ND_FABRIC_2_SWITCHES=leaf_3,leaf_4,bgw_1
+    ```
+    """
+    switch_config = ConfigTestSwitch()
+    fabric_group_config = ConfigTestFabricGroup()
+    fabric_groups: dict[str, list[str]] = {}
+    fabrics: dict[str, dict[str, list[str]]] = {}
+    for var_name in sorted(environ):
+        if match_ := re.fullmatch(r"ND_FABRIC_GROUP_(\d+)_MEMBERS", var_name):
+            index = match_.group(1)
+            name = environ.get(f"ND_FABRIC_GROUP_{index}", getattr(fabric_group_config, f"fabric_group_{index}", None))
+            if not name:
+                raise ValueError(f"ND_FABRIC_GROUP_{index} environment variable must be set to the name of fabric_group_{index}")
+            fabric_groups[name] = [_fabric_name(label) for label in _csv(var_name)]
+        elif match_ := re.fullmatch(r"ND_FABRIC_(\d+)_SWITCHES", var_name):
+            fabric = fabrics.setdefault(_fabric_name(f"fabric_{match_.group(1)}"), {})
+            for label in _csv(var_name):
+                ip4 = getattr(switch_config, f"{label}_ip4", None)
+                if ip4 is None:
+                    raise ValueError(f"{var_name} contains unknown switch {label}.  Expected one of bgw_<n>, leaf_<n>, spine_<n>.")
+                fabric.setdefault(label.rpartition("_")[0], []).append(ip4)
+    return {"fabric_groups": fabric_groups, "fabrics": fabrics}
+
+
+@cache
+def _topology() -> dict[str, Any]:
+    """
+    # Summary
+
+    Return the fabric group topology.
+
+    If ND_TOPOLOGY_FILE is set, the topology is read from that JSON file
+    (e.g. one written from a controller query), otherwise it is built
+    from environment variables.  See _declared_topology.
+
+    ## Format
+
+    ```json
+    {
+        "fabric_groups": {"MCFG1": ["SITE1", "SITE2"]},
+        "fabrics": {"SITE1": {"leaf": ["192.168.14.51"], "spine": ["192.168.14.21"]}}
+    }
+    ```
+    """
+    path = environ.get("ND_TOPOLOGY_FILE")
+    if not path:
+        return _declared_topology()
+    with open(path, encoding="utf-8") as handle:
+        topology = json.load(handle)
+    return {"fabric_groups": topology.get("fabric_groups", {}), "fabrics": topology.get("fabrics", {})}
+
+
+def _topology_fabric_groups() -> dict[str, list[str]]:
+    return _topology()["fabric_groups"]
+
+
+def _topology_fabrics() -> dict[str, dict[str, list[str]]]:
+    return _topology()["fabrics"]
+
+
+@dataclass
+class ConfigTestTopology:
+    """
+    # Summary
+
+    Fabric group -> member fabric -> switch hierarchy, with a precomputed
+    reverse index so that playbooks can target e.g. all leafs in a fabric
+    group without querying the controller for membership.
+
+    - fabric_groups: fabric group name -> member fabric names
+    - fabrics: fabric name -> switch role -> switch IPs
+    - switch_index: switch IP -> {fabric_name, switch_role, fabric_group_name}.
+      fabric_group_name is omitted if the switch's fabric is in no fabric group.
+
+    ## Ansible groups
+
+    - fabric_group_<fabric_group>: children fabric_<fabric>
+    - fabric_group_<fabric_group>_<role>: children fabric_<fabric>_<role>
+    - fabric_<fabric>: children fabric_<fabric>_<role>
+    - fabric_<fabric>_<role>: hosts
+
+    ## See Also
+
+    _topology function.
+    """
+    fabric_groups: dict[str, list[str]] = field(default_factory=_topology_fabric_groups)
+    fabrics: dict[str, dict[str, list[str]]] = field(default_factory=_topology_fabrics)
+    switch_index: dict[str, dict[str, str]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        fabric_index: dict[str, str] = {}
+        for fabric_group, members in self.fabric_groups.items():
+            for fabric in members:
+                if fabric in fabric_index:
+                    raise ValueError(f"Fabric {fabric} is a member of both {fabric_index[fabric]} and {fabric_group}")
+                fabric_index[fabric] = fabric_group
+        self.switch_index = {}
+        for fabric, roles in self.fabrics.items():
+            for role, switches in roles.items():
+                for switch in switches:
+                    if switch in self.switch_index:
+                        previous = self.switch_index[switch]
+                        raise ValueError(f"Switch {switch} is listed as both {previous['switch_role']} in {previous['fabric_name']} and {role} in {fabric}")
+                    self.switch_index[switch] = {"fabric_name": fabric, "switch_role": role}
+                    if fabric in fabric_index:
+                        self.switch_index[switch]["fabric_group_name"] = fabric_index[fabric]
+
+    def groups(self) -> dict[str, Any]:
+        """Return the fabric group hierarchy as Ansible inventory groups."""
+        fabric_group_types = {
+            ConfigTestFabricGroup().fabric_group_1: ConfigTestFabricGroup().fabric_type_1,
+            ConfigTestFabricGroup().fabric_group_2: ConfigTestFabricGroup().fabric_type_2,
+            ConfigTestFabricGroup().fabric_group_3: ConfigTestFabricGroup().fabric_type_3,
+        }
+        groups: dict[str, Any] = {}
+        for fabric, roles in self.fabrics.items():
+            groups[f"fabric_{fabric}"] = {
+                "children": [f"fabric_{fabric}_{role}" for role in roles],
+                "vars": {"fabric_name": fabric},
+            }
+            for role, switches in roles.items():
+                groups[f"fabric_{fabric}_{role}"] = {"hosts": list(switches)}
+        for fabric_group, members in self.fabric_groups.items():
+            group_vars = {"fabric_group_name": fabric_group}
+            if fabric_group in fabric_group_types:
+                group_vars["fabric_group_type"] = fabric_group_types[fabric_group]
+            groups[f"fabric_group_{fabric_group}"] = {
+                "children": [f"fabric_{fabric}" for fabric in members],
+                "vars": group_vars,
+            }
+            roles = sorted({role for fabric in members for role in self.fabrics.get(fabric, {})})
+            for role in roles:
+                groups[f"fabric_group_{fabric_group}_{role}"] = {
+                    "children": [f"fabric_{fabric}_{role}" for fabric in members if role in self.fabrics.get(fabric, {})],
+                }
+        return groups
+
+
 def _ndfc_config() -> dict[str, Any]:
-    return {
+    config: dict[str, Any] = {
         "hosts": [ConfigNdConnection().nd_ip4],
         "vars": {
             "ansible_connection": ConfigNdConnection().connection,
@@ -329,6 +687,11 @@ def _ndfc_config() -> dict[str, Any]:
             "ansible_httpapi_login_domain": ConfigNdConnection().nd_domain,
         },
     }
+    if ConfigNdReplay().replay:
+        config["hosts"] = [ConfigNdReplay().host]
+        config["vars"]["ansible_httpapi_port"] = ConfigNdReplay().port
+        config["vars"]["ansible_httpapi_use_ssl"] = ConfigNdReplay().use_ssl
+    return config
 
 def _nxos_config() -> dict[str, Any]:
     return {
@@ -377,14 +740,14 @@ class ConfigTestcaseDcnmNetwork:
     _vrfs = ConfigTestVrf()
 
     fabric_1: str = _fabrics.fabric_1
-    interface_1a: str = environ.get("ND_INTERFACE_1a", "Ethernet1/1")
-    interface_1b: str = environ.get("ND_INTERFACE_1b", "Ethernet1/2")
-    interface_1c: str = environ.get("ND_INTERFACE_1c", "Ethernet1/3")
-    interface_1d: str = environ.get("ND_INTERFACE_1d", "Ethernet1/4")
-    interface_2a: str = environ.get("ND_INTERFACE_2a", "Ethernet1/1")
-    interface_2b: str = environ.get("ND_INTERFACE_2b", "Ethernet1/2")
-    interface_2c: str = environ.get("ND_INTERFACE_2c", "Ethernet1/3")
-    interface_2d: str = environ.get("ND_INTERFACE_2d", "Ethernet1/4")
+    interface_1a: str = _interface("interface_1a", "Ethernet1/1")
+    interface_1b: str = _interface("interface_1b", "Ethernet1/2")
+    interface_1c: str = _interface("interface_1c", "Ethernet1/3")
+    interface_1d: str = _interface("interface_1d", "Ethernet1/4")
+    interface_2a: str = _interface("interface_2a", "Ethernet1/1")
+    interface_2b: str = _interface("interface_2b", "Ethernet1/2")
+    interface_2c: str = _interface("interface_2c", "Ethernet1/3")
+    interface_2d: str = _interface("interface_2d", "Ethernet1/4")
     switch_1: str = _switches.switch_1_ip4
     switch_2: str = _switches.switch_2_ip4
     vrf_1: str = _vrfs.vrf_1
@@ -474,6 +837,7 @@ config_test_switch_bgw = ConfigTestSwitchBgw()
 config_test_switch_spine = ConfigTestSwitchSpine()
 config_test_switch_leaf = ConfigTestSwitchLeaf()
 config_test_vrf = ConfigTestVrf()
+config_test_topology = ConfigTestTopology()
 
 fabric_1 = config_test_fabric.fabric_1
 fabric_name_1 = config_test_fabric.fabric_1
@@ -497,15 +861,15 @@ switch_3 = environ.get("ND_SWITCH_3_IP4", "172.22.150.103")
 switch_4 = environ.get("ND_SWITCH_4_IP4", "172.22.150.104")
 
 # Base set of interfaces
-interface_1a = environ.get("ND_INTERFACE_1a", "Ethernet1/1")
-interface_1b = environ.get("ND_INTERFACE_1b", "Ethernet1/2")
-interface_1c = environ.get("ND_INTERFACE_1c", "Ethernet1/3")
-interface_1d = environ.get("ND_INTERFACE_1d", "Ethernet1/4")
-interface_2a = environ.get("ND_INTERFACE_2a", "Ethernet1/1")
-interface_2b = environ.get("ND_INTERFACE_2b", "Ethernet1/2")
-interface_2c = environ.get("ND_INTERFACE_2c", "Ethernet1/3")
-interface_2d = environ.get("ND_INTERFACE_2d", "Ethernet1/4")
-interface_3a = environ.get("ND_INTERFACE_3a", "Ethernet1/3")
+interface_1a = _interface("interface_1a", "Ethernet1/1")
+interface_1b = _interface("interface_1b", "Ethernet1/2")
+interface_1c = _interface("interface_1c", "Ethernet1/3")
+interface_1d = _interface("interface_1d", "Ethernet1/4")
+interface_2a = _interface("interface_2a", "Ethernet1/1")
+interface_2b = _interface("interface_2b", "Ethernet1/2")
+interface_2c = _interface("interface_2c", "Ethernet1/3")
+interface_2d = _interface("interface_2d", "Ethernet1/4")
+interface_3a = _interface("interface_3a", "Ethernet1/3")
 
 testcase: object
 role = config_test_runner.nd_role
@@ -549,12 +913,20 @@ match role:
         vrf_1 = config_test_vrf.vrf_1
         vrf_2 = config_test_vrf.vrf_2
 
+switches = {1: switch_1, 2: switch_2, 3: switch_3, 4: switch_4}
+hostvars: dict[str, dict[str, Any]] = {switch: dict(index) for switch, index in config_test_topology.switch_index.items()}
+interface_owners: dict[int, str] = {}
+for switch_number, interface_ranges in sorted(_interface_ranges().items()):
+    owner = switches.get(switch_number) or _required(f"ND_SWITCH_{switch_number}_IP4", f"the IP of the switch that owns ND_INTERFACE_{switch_number}")
+    interface_owners[switch_number] = owner
+    hostvars.setdefault(owner, {})["interfaces"] = list(_expand_interfaces(interface_ranges))
+
 # output is printed to STDOUT, where ansible-playbook -i reads it.
 # If you change any vars above, be sure to add them below.
 # We'll clean this up as the integration test vars are standardized.
 
 output = {
-    "_meta": {"hostvars": {}},
+    "_meta": {"hostvars": hostvars},
     "all": {
         "children": ["ungrouped", "dcnm", "ndfc", "nxos"],
         "vars": {
@@ -602,6 +974,7 @@ output = {
             "interface_3a": interface_3a,
             "vrf_1": vrf_1,
             "vrf_2": vrf_2,
+            "fabric_group_members": config_test_topology.fabric_groups,
         },
     },
     "dcnm": ConfigHostNdfc().output,
@@ -627,6 +1000,13 @@ output = {
     "switch2": {"hosts": [config_test_switch_leaf.switch_2_ip4]},
     "switch3": {"hosts": [config_test_switch_leaf.switch_3_ip4]},
     "switch4": {"hosts": [config_test_switch_leaf.switch_4_ip4]},
+    **config_test_topology.groups(),
 }
 
+# Ansible applies _meta.hostvars only to hosts that are in a group.
+grouped_hosts = {host for name, group in output.items() if name != "_meta" for host in group.get("hosts", [])}
+for switch_number, owner in interface_owners.items():
+    if owner not in grouped_hosts:
+        raise ValueError(f"ND_INTERFACE_{switch_number} belongs to switch_{switch_number} ({owner}) for ND_ROLE {role}, which is not in any inventory group.  Its interfaces would be ignored.")
+
 print(json.dumps(output, indent=4, sort_keys=True))
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=line-too-long,too-few-public-methods
+"""
+# Summary
+
+Compact binary topology snapshot for very large inventories.
+
+Re-parsing a multi-megabyte JSON inventory on every ansible-playbook
+invocation is slow.  This script converts the JSON emitted by
+dynamic_inventory_env_prod.py (or any other Ansible dynamic inventory)
+into a compact binary snapshot, and then acts as a dynamic inventory
+script that reads that snapshot via mmap.
+
+- `--host <ip>` and `--group <name>` binary-search the snapshot and
+  read only the records they need.
+- `--list` streams JSON to STDOUT directly from the snapshot without
+  first building the complete inventory dict.
+
+## Usage
+
+### Write a snapshot
+
+```bash
+./dynamic_inventory_env_prod.py | ./dynamic_inventory_snapshot.py --write /tmp/inventory.ndis
+```
+
+### Use the snapshot as the dynamic inventory
+
+```bash
+export ND_INVENTORY_SNAPSHOT=/tmp/inventory.ndis
+export ANSIBLE_INVENTORY=$ND_ROLES_HOME/roles/dynamic_inventory_snapshot.py
+ansible-playbook dcnm_tests.yaml -i $ANSIBLE_INVENTORY
+```
+
+## Format
+
+All integers are little-endian unsigned 32-bit unless noted.
+
+- header
+- string index: string_count + 1 offsets into the string blob
+- string blob: interned UTF-8 strings (group names, non-IPv4 host names)
+- host records: IPv4 hosts first, sorted by packed address, followed by
+  named hosts, sorted by name.
+    - kind (u8): HOST_KIND_IPV4 or HOST_KIND_NAME
+    - key: packed IPv4 address, or string index
+    - vars offset, vars length: compact JSON in the vars blob
+      (length 0 means the host has no hostvars)
+- group records: sorted by name.
+    - name: string index
+    - flags (u8): GROUP_HAS_HOSTS, GROUP_HAS_CHILDREN, GROUP_HAS_VARS,
+      GROUP_DEFINED (clear for groups that are only referenced as children,
+      e.g. ungrouped)
+    - vars offset, vars length
+    - hosts start, hosts count: slice of the membership array (host indices)
+    - children start, children count: slice of the membership array
+      (group indices)
+- membership array: host and group indices
+- vars blob: compact JSON objects
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type  # pylint: disable=invalid-name
+__copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
+__author__ = "Allen Robel"
+
+import argparse
+import ipaddress
+import json
+import mmap
+import struct
+import sys
+from dataclasses import dataclass, field
+from os import environ
+from typing import Any, TextIO
+
+MAGIC = b"NDIS"
+VERSION = 1
+
+HOST_KIND_NAME = 0
+HOST_KIND_IPV4 = 4
+
+GROUP_HAS_HOSTS = 0x01
+GROUP_HAS_CHILDREN = 0x02
+GROUP_HAS_VARS = 0x04
+GROUP_DEFINED = 0x08
+
+# magic, version, reserved, string_count, host_count, ipv4_host_count,
+# group_count, string_index_offset, string_blob_offset, hosts_offset,
+# groups_offset, members_offset, vars_offset
+HEADER = struct.Struct("<4sHHIIIIIIIIII")
+HOST_RECORD = struct.Struct("<BxxxIII")
+GROUP_RECORD = struct.Struct("<IBxxxIIIIII")
+UINT32 = struct.Struct("<I")
+
+
+def _compact(value: Any) -> bytes:
+    """Serialize value as compact, deterministic JSON bytes."""
+    return json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def _pack_ipv4(name: str) -> int | None:
+    """Return the packed IPv4 address for name, or None if name is not an IPv4 address."""
+    try:
+        return int(ipaddress.IPv4Address(name))
+    except ValueError:
+        return None
+
+
+@dataclass
+class SnapshotWriter:
+    """
+    # Summary
+
+    Convert an Ansible dynamic inventory dict into a binary snapshot.
+
+    ## Usage
+
+    ```python
+    SnapshotWriter(inventory).write("/tmp/inventory.ndis")
+    ```
+    """
+    inventory: dict[str, Any]
+    _strings: list[bytes] = field(default_factory=list)
+    _string_index: dict[str, int] = field(default_factory=dict)
+    _vars_blob: bytearray = field(default_factory=bytearray)
+
+    def __post_init__(self) -> None:
+        # Legacy dynamic inventories may list a group's hosts directly e.g. "web": ["h1"]
+        self.inventory = {name: {"hosts": group} if isinstance(group, list) else group for name, group in self.inventory.items()}
+
+    def _intern(self, value: str) -> int:
+        """Return the string table index for value, adding it if needed."""
+        if value not in self._string_index:
+            self._string_index[value] = len(self._strings)
+            self._strings.append(value.encode("utf-8"))
+        return self._string_index[value]
+
+    def _add_vars(self, value: dict[str, Any] | None) -> tuple[int, int]:
+        """Append value to the vars blob and return (offset, length)."""
+        if value is None:
+            return 0, 0
+        data = _compact(value)
+        offset = len(self._vars_blob)
+        self._vars_blob.extend(data)
+        return offset, len(data)
+
+    def _host_names(self) -> tuple[list[str], list[str]]:
+        """Return (ipv4_hosts, named_hosts), each sorted in snapshot order."""
+        names: set[str] = set(self.inventory.get("_meta", {}).get("hostvars", {}))
+        for group_name, group in self.inventory.items():
+            if group_name == "_meta":
+                continue
+            names.update(group.get("hosts", []))
+        ipv4_hosts = sorted((name for name in names if _pack_ipv4(name) is not None), key=_pack_ipv4)
+        named_hosts = sorted((name for name in names if _pack_ipv4(name) is None), key=lambda name: name.encode("utf-8"))
+        return ipv4_hosts, named_hosts
+
+    def _group_names(self) -> list[str]:
+        """Return every group name, including children that are only referenced, in snapshot order."""
+        names: set[str] = set()
+        for group_name, group in self.inventory.items():
+            if group_name == "_meta":
+                continue
+            names.add(group_name)
+            names.update(group.get("children", []))
+        return sorted(names, key=lambda name: name.encode("utf-8"))
+
+    def build(self) -> bytes:
+        """Return the snapshot as bytes."""
+        hostvars = self.inventory.get("_meta", {}).get("hostvars", {})
+        ipv4_hosts, named_hosts = self._host_names()
+        hosts = ipv4_hosts + named_hosts
+        host_index = {name: index for index, name in enumerate(hosts)}
+        groups = self._group_names()
+        group_index = {name: index for index, name in enumerate(groups)}
+
+        host_records = bytearray()
+        for name in hosts:
+            vars_offset, vars_length = self._add_vars(hostvars.get(name))
+            packed = _pack_ipv4(name)
+            if packed is not None:
+                host_records.extend(HOST_RECORD.pack(HOST_KIND_IPV4, packed, vars_offset, vars_length))
+            else:
+                host_records.extend(HOST_RECORD.pack(HOST_KIND_NAME, self._intern(name), vars_offset, vars_length))
+
+        members: list[int] = []
+        group_records = bytearray()
+        for name in groups:
+            group = self.inventory.get(name, {})
+            flags = GROUP_DEFINED if name in self.inventory else 0
+            if "hosts" in group:
+                flags |= GROUP_HAS_HOSTS
+            if "children" in group:
+                flags |= GROUP_HAS_CHILDREN
+            if "vars" in group:
+                flags |= GROUP_HAS_VARS
+            vars_offset, vars_length = self._add_vars(group.get("vars"))
+            hosts_start = len(members)
+            members.extend(host_index[host] for host in group.get("hosts", []))
+            children_start = len(members)
+            members.extend(group_index[child] for child in group.get("children", []))
+            group_records.extend(
+                GROUP_RECORD.pack(
+                    self._intern(name),
+                    flags,
+                    vars_offset,
+                    vars_length,
+                    hosts_start,
+                    children_start - hosts_start,
+                    children_start,
+                    len(members) - children_start,
+                )
+            )
+
+        string_index = bytearray()
+        offset = 0
+        for value in self._strings:
+            string_index.extend(UINT32.pack(offset))
+            offset += len(value)
+        string_index.extend(UINT32.pack(offset))
+        string_blob = b"".join(self._strings)
+        member_array = struct.pack(f"<{len(members)}I", *members)
+
+        string_index_offset = HEADER.size
+        string_blob_offset = string_index_offset + len(string_index)
+        hosts_offset = string_blob_offset + len(string_blob)
+        groups_offset = hosts_offset + len(host_records)
+        members_offset = groups_offset + len(group_records)
+        vars_offset = members_offset + len(member_array)
+
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            0,
+            len(self._strings),
+            len(hosts),
+            len(ipv4_hosts),
+            len(groups),
+            string_index_offset,
+            string_blob_offset,
+            hosts_offset,
+            groups_offset,
+            members_offset,
+            vars_offset,
+        )
+        return b"".join([header, string_index, string_blob, host_records, group_records, member_array, self._vars_blob])
+
+    def write(self, path: str) -> None:
+        """Write the snapshot to path."""
+        with open(path, "wb") as handle:
+            handle.write(self.build())
+
+
+class SnapshotReader:
+    """
+    # Summary
+
+    Memory-mapped, read-only access to a binary inventory snapshot.
+
+    ## Usage
+
+    ```python
+    with SnapshotReader("/tmp/inventory.ndis") as snapshot:
+        hostvars = snapshot.host_vars("192.168.14.51")
+        group = snapshot.group("nxos")
+        snapshot.stream_list(sys.stdout)
+    ```
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _reserved,
+            self.string_count,
+            self.host_count,
+            self.ipv4_host_count,
+            self.group_count,
+            self._string_index_offset,
+            self._string_blob_offset,
+            self._hosts_offset,
+            self._groups_offset,
+            self._members_offset,
+            self._vars_offset,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an inventory snapshot")
+        if version != VERSION:
+            raise ValueError(f"{path} has snapshot version {version}, expected {VERSION}")
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._map.close()
+
+    def _string_bytes(self, index: int) -> bytes:
+        start, end = struct.unpack_from("<II", self._map, self._string_index_offset + index * UINT32.size)
+        return self._map[self._string_blob_offset + start : self._string_blob_offset + end]
+
+    def _string(self, index: int) -> str:
+        return self._string_bytes(index).decode("utf-8")
+
+    def _vars_bytes(self, offset: int, length: int) -> bytes:
+        start = self._vars_offset + offset
+        return self._map[start : start + length]
+
+    def _member(self, index: int) -> int:
+        return UINT32.unpack_from(self._map, self._members_offset + index * UINT32.size)[0]
+
+    def _host_record(self, index: int) -> tuple[int, int, int, int]:
+        return HOST_RECORD.unpack_from(self._map, self._hosts_offset + index * HOST_RECORD.size)
+
+    def _group_record(self, index: int) -> tuple[int, int, int, int, int, int, int, int]:
+        return GROUP_RECORD.unpack_from(self._map, self._groups_offset + index * GROUP_RECORD.size)
+
+    def _host_name(self, index: int) -> str:
+        kind, key, _vars_offset, _vars_length = self._host_record(index)
+        if kind == HOST_KIND_IPV4:
+            return str(ipaddress.IPv4Address(key))
+        return self._string(key)
+
+    def _find_host(self, name: str) -> int | None:
+        """Binary-search the host records and return the index of name, or None."""
+        packed = _pack_ipv4(name)
+        if packed is not None:
+            low, high = 0, self.ipv4_host_count
+            while low < high:
+                middle = (low + high) // 2
+                key = self._host_record(middle)[1]
+                if key < packed:
+                    low = middle + 1
+                elif key > packed:
+                    high = middle
+                else:
+                    return middle
+            return None
+        target = name.encode("utf-8")
+        low, high = self.ipv4_host_count, self.host_count
+        while low < high:
+            middle = (low + high) // 2
+            key = self._string_bytes(self._host_record(middle)[1])
+            if key < target:
+                low = middle + 1
+            elif key > target:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def _find_group(self, name: str) -> int | None:
+        """Binary-search the group records and return the index of name, or None."""
+        target = name.encode("utf-8")
+        low, high = 0, self.group_count
+        while low < high:
+            middle = (low + high) // 2
+            key = self._string_bytes(self._group_record(middle)[0])
+            if key < target:
+                low = middle + 1
+            elif key > target:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def host_vars(self, name: str) -> dict[str, Any]:
+        """Return the hostvars for host name, or an empty dict if there are none."""
+        index = self._find_host(name)
+        if index is None:
+            return {}
+        _kind, _key, vars_offset, vars_length = self._host_record(index)
+        if vars_length == 0:
+            return {}
+        return json.loads(self._vars_bytes(vars_offset, vars_length))
+
+    def group(self, name: str) -> dict[str, Any]:
+        """Return the inventory entry for group name, or an empty dict if it does not exist."""
+        index = self._find_group(name)
+        if index is None or not self._group_record(index)[1] & GROUP_DEFINED:
+            return {}
+        return json.loads(self._group_json(index))
+
+    def _group_json(self, index: int) -> bytes:
+        """Return the JSON object for the group at index without decoding its vars."""
+        _name, flags, vars_offset, vars_length, hosts_start, hosts_count, children_start, children_count = self._group_record(index)
+        parts: list[bytes] = []
+        if flags & GROUP_HAS_CHILDREN:
+            children = [self._string(self._group_record(self._member(children_start + i))[0]) for i in range(children_count)]
+            parts.append(b'"children":' + _compact(children))
+        if flags & GROUP_HAS_HOSTS:
+            hosts = [self._host_name(self._member(hosts_start + i)) for i in range(hosts_count)]
+            parts.append(b'"hosts":' + _compact(hosts))
+        if flags & GROUP_HAS_VARS:
+            parts.append(b'"vars":' + self._vars_bytes(vars_offset, vars_length))
+        return b"{" + b",".join(parts) + b"}"
+
+    def stream_list(self, out: TextIO) -> None:
+        """Write the complete inventory as JSON to out, one record at a time."""
+        out.write('{"_meta":{"hostvars":{')
+        separator = ""
+        for index in range(self.host_count):
+            _kind, _key, vars_offset, vars_length = self._host_record(index)
+            if vars_length == 0:
+                continue
+            out.write(f"{separator}{json.dumps(self._host_name(index))}:")
+            out.write(self._vars_bytes(vars_offset, vars_length).decode("utf-8"))
+            separator = ","
+        out.write("}}")
+        for index in range(self.group_count):
+            name_index, flags = self._group_record(index)[:2]
+            if not flags & GROUP_DEFINED:
+                continue
+            name = self._string(name_index)
+            out.write(f",{json.dumps(name)}:")
+            out.write(self._group_json(index).decode("utf-8"))
+        out.write("}\n")
+
+
+def _snapshot_path() -> str:
+    """Get the snapshot path from the environment or raise ValueError."""
+    value = environ.get("ND_INVENTORY_SNAPSHOT")
+    if not value:
+        raise ValueError("ND_INVENTORY_SNAPSHOT environment variable must be set to the path of an inventory snapshot")
+    return value
+
+
+def main() -> None:
+    """Dynamic inventory entry point."""
+    parser = argparse.ArgumentParser(description="Binary inventory snapshot reader/writer.")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--list", action="store_true", help="Stream the complete inventory as JSON.")
+    action.add_argument("--host", help="Print hostvars for HOST as JSON.")
+    action.add_argument("--group", help="Print the inventory entry for GROUP as JSON.")
+    action.add_argument("--write", metavar="PATH", help="Read an inventory as JSON from STDIN and write a snapshot to PATH.")
+    args = parser.parse_args()
+
+    if args.write:
+        SnapshotWriter(json.load(sys.stdin)).write(args.write)
+        return
+
+    with SnapshotReader(_snapshot_path()) as snapshot:
+        if args.list:
+            snapshot.stream_list(sys.stdout)
+        elif args.host:
+            print(json.dumps(snapshot.host_vars(args.host)))
+        else:
+            print(json.dumps(snapshot.group(args.group)))
+
+
+if __name__ == "__main__":
+    main()
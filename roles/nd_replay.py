@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# pylint: disable=line-too-long,too-few-public-methods
+"""
+# Summary
+
+Record/replay stand-in for the ND controller.
+
+Integration tests for the roles and playbooks in this repository need a
+live ND controller, and a single testcase can wait minutes on it.  This
+script records the controller's request/response pairs during one live run
+into a JSONL fixture store, and then replays them locally so that playbook
+iteration runs at local speed.
+
+## Usage
+
+### Record
+
+Start a recording proxy in front of the live controller, and point the
+inventory at it (see ND_REPLAY below).
+
+```bash
+./nd_replay.py record --upstream https://$ND_IP4 --fixtures fixtures.jsonl --port 8443
+```
+
+### Replay
+
+Serve the recorded fixtures.  --latency-scale 0 (the default) replies
+immediately.  --latency-scale 1.0 reproduces the recorded latencies.
+
+```bash
+./nd_replay.py replay --fixtures fixtures.jsonl --port 8443 --latency-scale 0
+```
+
+### Report
+
+Print per-testcase API call counts and latencies for a fixture store.
+
+```bash
+./nd_replay.py report --fixtures fixtures.jsonl
+```
+
+### Inventory
+
+dynamic_inventory_env_prod.py points the dcnm and ndfc groups at the
+proxy/server when ND_REPLAY is set.
+
+```bash
+export ND_REPLAY=127.0.0.1:8443  # Host and port of nd_replay.py record/replay
+export ND_REPLAY_USE_SSL=false   # true if nd_replay.py was started with --certfile
+```
+
+Playbooks that set ansible_httpapi_use_ssl: true in their play vars (e.g.
+fabric_group/*.yaml) override the inventory.  Start nd_replay.py with
+--certfile and --keyfile (any self-signed certificate) for those.
+
+## Fixture format
+
+One JSON object per line:
+
+- testcase: ND_TESTCASE (or --testcase) at record time
+- seq: order of the request within the recording session
+- method, path, request_body: the request
+- status, response_headers, response_body: the controller's response
+- elapsed: seconds the controller took to respond
+
+Recording a testcase again replaces its earlier records in the store.
+
+Passwords and session tokens (e.g. the /login jwttoken) in request and
+response bodies, and cookie/token headers in responses, are redacted
+before they are written.  JSON response bodies are stored in canonical
+form.  Replay does not depend on their real values.
+
+If the controller cannot be reached, the recorder answers 502 (or 504 on
+timeout) and records nothing.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type  # pylint: disable=invalid-name
+__copyright__ = "Copyright (c) 2024 Cisco and/or its affiliates."
+__author__ = "Allen Robel"
+
+import argparse
+import json
+import signal
+import ssl
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import environ
+from typing import Any
+
+REDACTED = "********"
+# Lower-case JSON keys and response headers whose values are never written to a fixture store.
+REDACTED_KEYS = ("password", "passwd", "userpasswd", "jwttoken", "token", "dcnm-token")
+REDACTED_HEADERS = ("authorization", "cookie", "set-cookie", "dcnm-token")
+
+# Headers that must not be copied between the client, proxy and upstream.
+HOP_BY_HOP_HEADERS = (
+    "connection",
+    "content-length",
+    "host",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "accept-encoding",
+    "content-encoding",
+)
+
+
+def _decode(body: bytes) -> str:
+    """Decode a request or response body for storage in a JSONL fixture."""
+    return body.decode("utf-8", errors="surrogateescape")
+
+
+def _encode(body: str) -> bytes:
+    """Reverse _decode."""
+    return body.encode("utf-8", errors="surrogateescape")
+
+
+def _redact(value: Any) -> Any:
+    """Return value with the values of any password- or token-like keys redacted."""
+    if isinstance(value, dict):
+        return {key: REDACTED if key.lower() in REDACTED_KEYS else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _canonical_body(body: str) -> str:
+    """
+    # Summary
+
+    Return a canonical, redacted form of a request or response body, so
+    that semantically identical requests produce the same fixture key and
+    no secrets are written to the fixture store.  Non-JSON bodies are
+    returned unchanged.
+    """
+    if not body:
+        return ""
+    try:
+        return json.dumps(_redact(json.loads(body)), separators=(",", ":"), sort_keys=True)
+    except ValueError:
+        return body
+
+
+def _redact_headers(headers: dict[str, str]) -> dict[str, str]:
+    """Return headers with session cookies and tokens redacted."""
+    return {key: REDACTED if key.lower() in REDACTED_HEADERS else value for key, value in headers.items()}
+
+
+def _unverified_context() -> ssl.SSLContext:
+    """Client context for the controller, which typically has a self-signed certificate."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _fixture_key(method: str, path: str, body: str) -> tuple[str, str, str]:
+    return method.upper(), path, _canonical_body(body)
+
+
+def _ssl_wrap(server: ThreadingHTTPServer, certfile: str | None, keyfile: str | None) -> None:
+    """Serve TLS on server if a certificate was given."""
+    if not certfile:
+        return
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+
+
+@dataclass
+class CallStats:
+    """Per-testcase API call count and latency accumulator."""
+    calls: int = 0
+    misses: int = 0
+    latency: float = 0.0
+    latency_max: float = 0.0
+
+    def add(self, elapsed: float, miss: bool = False) -> None:
+        """Account for one API call."""
+        self.calls += 1
+        self.misses += int(miss)
+        self.latency += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the accumulated stats as a dict."""
+        return {
+            "calls": self.calls,
+            "misses": self.misses,
+            "latency_total": round(self.latency, 3),
+            "latency_mean": round(self.latency / self.calls, 3) if self.calls else 0.0,
+            "latency_max": round(self.latency_max, 3),
+        }
+
+
+@dataclass
+class FixtureRecorder:
+    """
+    # Summary
+
+    Forward requests to the live controller and append each
+    request/response pair to a JSONL fixture store.
+    """
+    upstream: str
+    fixtures: str
+    testcase: str
+    timeout: float = 300.0
+    stats: CallStats = field(default_factory=CallStats)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _seq: int = 0
+    _context: ssl.SSLContext = field(default_factory=_unverified_context)
+
+    def __post_init__(self) -> None:
+        """Replace any earlier recording of this testcase, so that sessions are never interleaved on replay."""
+        try:
+            with open(self.fixtures, encoding="utf-8") as handle:
+                lines = [line for line in handle if line.strip() and json.loads(line)["testcase"] != self.testcase]
+        except FileNotFoundError:
+            return
+        with open(self.fixtures, "w", encoding="utf-8") as handle:
+            handle.writelines(lines)
+
+    def forward(self, method: str, path: str, headers: dict[str, str], body: bytes) -> tuple[int, dict[str, str], bytes]:
+        """Forward one request upstream, record it, and return (status, headers, body)."""
+        request = urllib.request.Request(f"{self.upstream.rstrip('/')}{path}", data=body or None, method=method)
+        for key, value in headers.items():
+            if key.lower() not in HOP_BY_HOP_HEADERS:
+                request.add_header(key, value)
+        start = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout, context=self._context) as response:
+                status, response_headers, response_body = response.status, dict(response.headers.items()), response.read()
+        except urllib.error.HTTPError as error:
+            status, response_headers, response_body = error.code, dict(error.headers.items()), error.read()
+        except OSError as error:
+            # URLError, TimeoutError, etc.  The controller did not respond, so there is nothing to record.
+            reason = getattr(error, "reason", error)
+            status = 504 if isinstance(reason, TimeoutError) else 502
+            with self._lock:
+                self.stats.add(time.monotonic() - start, miss=True)
+            message = json.dumps({"error": f"nd_replay: upstream {self.upstream} failed: {reason}"}).encode("utf-8")
+            return status, {"Content-Type": "application/json"}, message
+        elapsed = time.monotonic() - start
+        response_headers = {key: value for key, value in response_headers.items() if key.lower() not in HOP_BY_HOP_HEADERS}
+
+        with self._lock:
+            self._seq += 1
+            record = {
+                "testcase": self.testcase,
+                "seq": self._seq,
+                "method": method,
+                "path": path,
+                "request_body": _canonical_body(_decode(body)),
+                "status": status,
+                "response_headers": _redact_headers(response_headers),
+                "response_body": _canonical_body(_decode(response_body)),
+                "elapsed": round(elapsed, 6),
+            }
+            with open(self.fixtures, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+            self.stats.add(elapsed)
+        return status, response_headers, response_body
+
+
+@dataclass
+class FixtureReplayer:
+    """
+    # Summary
+
+    Serve recorded responses from a JSONL fixture store.
+
+    Requests are matched on (method, path, canonical request body).
+    Repeated requests with the same key are answered in recorded order,
+    so that e.g. a query before and after a merge return different
+    responses.  Once the recorded responses for a key are exhausted,
+    the last one is repeated.
+    """
+    fixtures: str
+    testcase: str | None = None
+    latency_scale: float = 0.0
+    stats: CallStats = field(default_factory=CallStats)
+    _responses: dict[tuple[str, str, str], deque[dict[str, Any]]] = field(default_factory=lambda: defaultdict(deque))
+    _last: dict[tuple[str, str, str], dict[str, Any]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        for record in _load_fixtures(self.fixtures):
+            if self.testcase and record["testcase"] != self.testcase:
+                continue
+            key = _fixture_key(record["method"], record["path"], record["request_body"])
+            self._responses[key].append(record)
+
+    def lookup(self, method: str, path: str, body: bytes) -> dict[str, Any] | None:
+        """Return the next recorded response for the request, or None if there is none."""
+        key = _fixture_key(method, path, _decode(body))
+        with self._lock:
+            if self._responses.get(key):
+                self._last[key] = self._responses[key].popleft()
+            record = self._last.get(key)
+            if record is None:
+                self.stats.add(0.0, miss=True)
+                return None
+            delay = record["elapsed"] * self.latency_scale
+            self.stats.add(delay)
+        if delay > 0:
+            time.sleep(delay)
+        return record
+
+
+def _load_fixtures(path: str) -> list[dict[str, Any]]:
+    """Read a JSONL fixture store, sorted by testcase and recording order."""
+    with open(path, encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle if line.strip()]
+    return sorted(records, key=lambda record: (record["testcase"], record["seq"]))
+
+
+def _handler(backend: FixtureRecorder | FixtureReplayer) -> type[BaseHTTPRequestHandler]:
+    """Return a request handler class bound to backend."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Dispatch every HTTP method to the recorder or replayer."""
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, status: int, headers: dict[str, str], body: bytes) -> None:
+            self.send_response(status)
+            for key, value in headers.items():
+                if key.lower() not in ("date", "server"):
+                    self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _dispatch(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if isinstance(backend, FixtureRecorder):
+                self._respond(*backend.forward(self.command, self.path, dict(self.headers.items()), body))
+                return
+            record = backend.lookup(self.command, self.path, body)
+            if record is None:
+                message = json.dumps({"error": f"nd_replay: no fixture for {self.command} {self.path}"}).encode("utf-8")
+                self._respond(404, {"Content-Type": "application/json"}, message)
+                return
+            self._respond(record["status"], record["response_headers"], _encode(record["response_body"]))
+
+        do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _dispatch  # noqa: N815
+
+        def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+            pass
+
+    return Handler
+
+
+def _interrupt(_signum: int, _frame: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def _serve(backend: FixtureRecorder | FixtureReplayer, args: argparse.Namespace) -> None:
+    """Serve until interrupted (SIGINT or SIGTERM), then print call stats for the session."""
+    signal.signal(signal.SIGTERM, _interrupt)
+    server = ThreadingHTTPServer((args.bind, args.port), _handler(backend))
+    _ssl_wrap(server, args.certfile, args.keyfile)
+    print(f"nd_replay: serving on {args.bind}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps({backend.testcase or "all": backend.stats.summary()}, indent=4), file=sys.stderr)
+
+
+def report(path: str) -> dict[str, dict[str, Any]]:
+    """Return per-testcase API call counts and recorded latencies for a fixture store."""
+    stats: dict[str, CallStats] = defaultdict(CallStats)
+    for record in _load_fixtures(path):
+        stats[record["testcase"]].add(record["elapsed"])
+    return {testcase: testcase_stats.summary() for testcase, testcase_stats in sorted(stats.items())}
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Record/replay stand-in for the ND controller.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_server_args(subparser: argparse.ArgumentParser) -> None:
+        subparser.add_argument("--fixtures", required=True, help="JSONL fixture store.")
+        subparser.add_argument("--bind", default="127.0.0.1", help="Listen address.")
+        subparser.add_argument("--port", type=int, default=8443, help="Listen port.")
+        subparser.add_argument("--certfile", help="Serve TLS with this certificate.")
+        subparser.add_argument("--keyfile", help="Private key for --certfile.")
+
+    record_parser = subparsers.add_parser("record", help="Record a live run.")
+    add_server_args(record_parser)
+    record_parser.add_argument("--upstream", required=True, help="Controller URL e.g. https://10.1.1.1")
+    record_parser.add_argument("--testcase", default=environ.get("ND_TESTCASE", "default"), help="Testcase name to tag records with.")
+    record_parser.add_argument("--timeout", type=float, default=300.0, help="Upstream request timeout in seconds.")
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a recorded run.")
+    add_server_args(replay_parser)
+    replay_parser.add_argument("--testcase", default=environ.get("ND_TESTCASE"), help="Only replay records for this testcase.")
+    replay_parser.add_argument("--latency-scale", type=float, default=0.0, help="Multiply recorded latencies by this factor.")
+
+    report_parser = subparsers.add_parser("report", help="Print per-testcase API call counts and latencies.")
+    report_parser.add_argument("--fixtures", required=True, help="JSONL fixture store.")
+
+    args = parser.parse_args()
+    match args.command:
+        case "record":
+            _serve(FixtureRecorder(args.upstream, args.fixtures, args.testcase, args.timeout), args)
+        case "replay":
+            _serve(FixtureReplayer(args.fixtures, args.testcase, args.latency_scale), args)
+        case "report":
+            print(json.dumps(report(args.fixtures), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for credential_provider.py."""
+
+import sys
+
+import pytest
+
+import credential_provider
+from credential_provider import CommandCredentialProvider, CredentialCache, FakeCredentialProvider, FileCredentialProvider
+
+NAMES = ("ND_PASSWORD", "NXOS_PASSWORD")
+
+
+def test_cache_one_fetch():
+    provider = FakeCredentialProvider({"ND_PASSWORD": "nd-secret", "NXOS_PASSWORD": "nxos-secret"})
+    cache = CredentialCache(provider)
+
+    for _ in range(3):
+        assert cache.get(NAMES) == {"ND_PASSWORD": "nd-secret", "NXOS_PASSWORD": "nxos-secret"}
+    assert provider.fetches == 1
+
+    cache.get(("ND_PASSWORD", "OTHER"))
+    assert provider.fetches == 2
+
+
+def test_cache_caches_unresolved_names():
+    provider = FakeCredentialProvider({"ND_PASSWORD": "nd-secret"})
+    cache = CredentialCache(provider)
+
+    for _ in range(3):
+        assert cache.get(NAMES) == {"ND_PASSWORD": "nd-secret"}
+    assert provider.fetches == 1
+
+
+def test_resolve_credentials_fake_backend(monkeypatch):
+    monkeypatch.setenv("ND_CREDENTIAL_PROVIDER", "fake")
+    monkeypatch.setenv("ND_CREDENTIAL_FAKE", '{"ND_PASSWORD": "nd-secret"}')
+    monkeypatch.setattr(credential_provider, "_cache", None)
+
+    for _ in range(3):
+        assert credential_provider.resolve_credentials(NAMES) == {"ND_PASSWORD": "nd-secret"}
+    assert credential_provider._cache.provider.fetches == 1  # pylint: disable=protected-access
+
+
+def test_file_provider_quotes(tmp_path):
+    secrets = tmp_path / "secrets"
+    secrets.write_text("# comment\nexport A=\"quoted\"\nB='x\nC=abc\"\nD=''\n", encoding="utf-8")
+    assert FileCredentialProvider(str(secrets)).fetch(("A", "B", "C", "D")) == {"A": "quoted", "B": "'x", "C": 'abc"'}
+
+
+def test_file_provider_missing_file(tmp_path):
+    with pytest.raises(ValueError, match="ND_CREDENTIAL_FILE must be a readable KEY=VALUE credential file"):
+        FileCredentialProvider(str(tmp_path / "missing")).fetch(NAMES)
+
+
+def test_command_provider(tmp_path):
+    script = tmp_path / "secrets.py"
+    script.write_text("import json, sys\nprint(json.dumps({name: name.lower() for name in sys.argv[1:]}))\n", encoding="utf-8")
+    assert CommandCredentialProvider(f"{sys.executable} {script}").fetch(NAMES) == {"ND_PASSWORD": "nd_password", "NXOS_PASSWORD": "nxos_password"}
+
+
+def test_command_provider_errors(tmp_path):
+    script = tmp_path / "secrets.py"
+    script.write_text("print('[1, 2]')\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="ND_CREDENTIAL_COMMAND must print a JSON object.  Got list"):
+        CommandCredentialProvider(f"{sys.executable} {script}").fetch(NAMES)
+    with pytest.raises(ValueError, match="ND_CREDENTIAL_COMMAND must be an executable command"):
+        CommandCredentialProvider(str(tmp_path / "missing")).fetch(NAMES)
+    script.write_text("import time\ntime.sleep(5)\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="ND_CREDENTIAL_COMMAND must exit within"):
+        CommandCredentialProvider(f"{sys.executable} {script}", timeout=0.5).fetch(NAMES)
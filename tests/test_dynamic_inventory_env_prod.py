@@ -0,0 +1,162 @@
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for dynamic_inventory_env_prod.py."""
+
+import importlib.util
+import itertools
+import json
+from os import environ
+from pathlib import Path
+
+import pytest
+
+import credential_provider
+
+SCRIPT = Path(__file__).resolve().parent.parent / "roles" / "dynamic_inventory_env_prod.py"
+REQUIRED_ENV = {
+    "ND_DOMAIN": "local",
+    "ND_IP4": "192.0.2.1",
+    "ND_ROLE": "dcnm_fabric_group",
+    "ND_TESTCASE": "test_query",
+    "ND_PASSWORD": "nd-secret",
+    "NXOS_PASSWORD": "nxos-secret",
+}
+_counter = itertools.count()
+
+
+@pytest.fixture(name="load_prod")
+def fixture_load_prod(monkeypatch, capsys):
+    """
+    Return a function that imports a fresh copy of the inventory script with
+    the given environment, and returns (module, printed inventory).
+    """
+
+    def load(**env):
+        for var_name in list(environ):
+            if var_name.startswith(("ND_", "NXOS_")):
+                monkeypatch.delenv(var_name)
+        for var_name, value in {**REQUIRED_ENV, **env}.items():
+            monkeypatch.setenv(var_name, value)
+        monkeypatch.setattr(credential_provider, "_cache", None)
+        spec = importlib.util.spec_from_file_location(f"dynamic_inventory_env_prod_{next(_counter)}", SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module, json.loads(capsys.readouterr().out)
+
+    return load
+
+
+def test_topology_reverse_index(load_prod):
+    prod, _ = load_prod()
+    topology = prod.ConfigTestTopology(
+        fabric_groups={"MCFG1": ["SITE1", "SITE2"]},
+        fabrics={
+            "SITE1": {"leaf": ["10.0.0.1"], "spine": ["10.0.0.2"]},
+            "SITE2": {"leaf": ["10.0.0.3"]},
+            "SITE3": {"leaf": ["10.0.0.4"]},
+        },
+    )
+    assert topology.switch_index == {
+        "10.0.0.1": {"fabric_name": "SITE1", "fabric_group_name": "MCFG1", "switch_role": "leaf"},
+        "10.0.0.2": {"fabric_name": "SITE1", "fabric_group_name": "MCFG1", "switch_role": "spine"},
+        "10.0.0.3": {"fabric_name": "SITE2", "fabric_group_name": "MCFG1", "switch_role": "leaf"},
+        "10.0.0.4": {"fabric_name": "SITE3", "switch_role": "leaf"},
+    }
+
+
+def test_topology_groups(load_prod):
+    prod, _ = load_prod()
+    topology = prod.ConfigTestTopology(
+        fabric_groups={"MCFG1": ["SITE1", "SITE2"]},
+        fabrics={"SITE1": {"leaf": ["10.0.0.1"], "spine": ["10.0.0.2"]}, "SITE2": {"leaf": ["10.0.0.3"]}},
+    )
+    assert topology.groups() == {
+        "fabric_SITE1": {"children": ["fabric_SITE1_leaf", "fabric_SITE1_spine"], "vars": {"fabric_name": "SITE1"}},
+        "fabric_SITE1_leaf": {"hosts": ["10.0.0.1"]},
+        "fabric_SITE1_spine": {"hosts": ["10.0.0.2"]},
+        "fabric_SITE2": {"children": ["fabric_SITE2_leaf"], "vars": {"fabric_name": "SITE2"}},
+        "fabric_SITE2_leaf": {"hosts": ["10.0.0.3"]},
+        "fabric_group_MCFG1": {"children": ["fabric_SITE1", "fabric_SITE2"], "vars": {"fabric_group_name": "MCFG1", "fabric_group_type": "MCFG"}},
+        "fabric_group_MCFG1_leaf": {"children": ["fabric_SITE1_leaf", "fabric_SITE2_leaf"]},
+        "fabric_group_MCFG1_spine": {"children": ["fabric_SITE1_spine"]},
+    }
+
+
+def test_topology_fabric_in_two_groups(load_prod):
+    prod, _ = load_prod()
+    with pytest.raises(ValueError, match="Fabric SITE1 is a member of both MCFG1 and MCFG2"):
+        prod.ConfigTestTopology(fabric_groups={"MCFG1": ["SITE1"], "MCFG2": ["SITE1"]}, fabrics={})
+
+
+def test_topology_duplicate_switch(load_prod):
+    prod, _ = load_prod()
+    with pytest.raises(ValueError, match="Switch 10.0.0.1 is listed as both leaf in SITE1 and spine in SITE2"):
+        prod.ConfigTestTopology(fabric_groups={}, fabrics={"SITE1": {"leaf": ["10.0.0.1"]}, "SITE2": {"spine": ["10.0.0.1"]}})
+
+
+def test_declared_topology(load_prod):
+    prod, inventory = load_prod(
+        ND_FABRIC_1="SITE1",
+        ND_FABRIC_2="SITE2",
+        ND_FABRIC_GROUP_1="MCFG1",
+        ND_FABRIC_GROUP_1_MEMBERS="fabric_1,fabric_2",
+        ND_FABRIC_1_SWITCHES="leaf_1,spine_1",
+        ND_FABRIC_2_SWITCHES="leaf_2",
+        ND_FABRIC_3_SWITCHES="bgw_1",
+        ND_FABRIC_3="SITE3",
+    )
+    assert prod.config_test_topology.switch_index == {
+        "192.168.14.51": {"fabric_name": "SITE1", "fabric_group_name": "MCFG1", "switch_role": "leaf"},
+        "192.168.14.21": {"fabric_name": "SITE1", "fabric_group_name": "MCFG1", "switch_role": "spine"},
+        "192.168.14.52": {"fabric_name": "SITE2", "fabric_group_name": "MCFG1", "switch_role": "leaf"},
+        "192.168.14.11": {"fabric_name": "SITE3", "switch_role": "bgw"},
+    }
+    assert inventory["_meta"]["hostvars"]["192.168.14.11"] == {"fabric_name": "SITE3", "switch_role": "bgw"}
+    assert inventory["fabric_group_MCFG1_leaf"] == {"children": ["fabric_SITE1_leaf", "fabric_SITE2_leaf"]}
+    assert inventory["all"]["vars"]["fabric_group_members"] == {"MCFG1": ["SITE1", "SITE2"]}
+
+
+def test_parse_interface_ranges(load_prod):
+    prod, _ = load_prod()
+    assert prod._parse_interface_ranges("Ethernet1/1-4, Ethernet2/7,") == (("Ethernet1", 1, 4), ("Ethernet2", 7, 7))
+    with pytest.raises(ValueError, match="End port is less than start port"):
+        prod._parse_interface_ranges("Ethernet1/4-1")
+    with pytest.raises(ValueError, match="Invalid interface range Ethernet1"):
+        prod._parse_interface_ranges("Ethernet1")
+
+
+def test_nth_interface_across_ranges(load_prod):
+    prod, _ = load_prod()
+    ranges = (("Ethernet1", 1, 2), ("Ethernet2", 5, 5), ("Ethernet3", 10, 12))
+    assert [prod._nth_interface(ranges, position) for position in range(7)] == [
+        "Ethernet1/1",
+        "Ethernet1/2",
+        "Ethernet2/5",
+        "Ethernet3/10",
+        "Ethernet3/11",
+        "Ethernet3/12",
+        None,
+    ]
+
+
+def test_interface_precedence(load_prod):
+    prod, inventory = load_prod(ND_INTERFACE_2="Ethernet1/10-11,Ethernet2/1", ND_INTERFACE_2b="Ethernet9/9")
+    assert prod._interface("interface_2a", "Ethernet1/1") == "Ethernet1/10"
+    assert prod._interface("interface_2b", "Ethernet1/2") == "Ethernet9/9"
+    assert prod._interface("interface_2c", "Ethernet1/3") == "Ethernet2/1"
+    assert prod._interface("interface_2d", "Ethernet1/4") == "Ethernet1/4"
+    assert prod._interface("interface_1a", "Ethernet1/1") == "Ethernet1/1"
+    assert inventory["all"]["vars"]["interface_2d"] == "Ethernet1/4"
+    assert inventory["_meta"]["hostvars"]["192.168.14.21"]["interfaces"] == ["Ethernet1/10", "Ethernet1/11", "Ethernet2/1"]
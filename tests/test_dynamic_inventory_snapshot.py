@@ -0,0 +1,72 @@
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Round-trip and lookup tests for dynamic_inventory_snapshot.py."""
+
+import io
+import json
+
+from dynamic_inventory_snapshot import SnapshotReader, SnapshotWriter
+
+INVENTORY = {
+    "_meta": {
+        "hostvars": {
+            "192.168.14.51": {"fabric_name": "SITE1", "interfaces": ["Ethernet1/1", "Ethernet1/2"]},
+            "ndfc1": {"ansible_host": "10.1.1.1"},
+        },
+    },
+    "all": {"children": ["ungrouped", "ndfc", "nxos"], "vars": {"ansible_user": "admin"}},
+    "ndfc": {"hosts": ["ndfc1"], "vars": {"ansible_network_os": "cisco.dcnm.dcnm"}},
+    "nxos": {"children": ["leaf_1", "spine_1"]},
+    "leaf_1": {"hosts": ["192.168.14.51"]},
+    "spine_1": {"hosts": ["192.168.14.21"]},
+}
+
+
+def _snapshot(tmp_path, inventory):
+    path = tmp_path / "inventory.ndis"
+    SnapshotWriter(inventory).write(str(path))
+    return SnapshotReader(str(path))
+
+
+def test_stream_list_round_trip(tmp_path):
+    out = io.StringIO()
+    with _snapshot(tmp_path, INVENTORY) as snapshot:
+        snapshot.stream_list(out)
+    assert json.loads(out.getvalue()) == INVENTORY
+
+
+def test_host_vars(tmp_path):
+    with _snapshot(tmp_path, INVENTORY) as snapshot:
+        assert snapshot.host_vars("192.168.14.51") == INVENTORY["_meta"]["hostvars"]["192.168.14.51"]
+        assert snapshot.host_vars("ndfc1") == {"ansible_host": "10.1.1.1"}
+        assert snapshot.host_vars("192.168.14.21") == {}
+        assert snapshot.host_vars("192.168.14.99") == {}
+        assert snapshot.host_vars("missing") == {}
+
+
+def test_group(tmp_path):
+    with _snapshot(tmp_path, INVENTORY) as snapshot:
+        assert snapshot.group("ndfc") == INVENTORY["ndfc"]
+        assert snapshot.group("nxos") == INVENTORY["nxos"]
+        assert snapshot.group("ungrouped") == {}
+        assert snapshot.group("missing") == {}
+
+
+def test_legacy_list_groups(tmp_path):
+    out = io.StringIO()
+    with _snapshot(tmp_path, {"web": ["h1", "10.0.0.1"]}) as snapshot:
+        assert snapshot.group("web") == {"hosts": ["h1", "10.0.0.1"]}
+        snapshot.stream_list(out)
+    assert json.loads(out.getvalue()) == {"_meta": {"hostvars": {}}, "web": {"hosts": ["h1", "10.0.0.1"]}}
@@ -0,0 +1,95 @@
+#
+# Copyright (c) 2024 Cisco and/or its affiliates.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for nd_replay.py.  No network is used."""
+
+import json
+
+from nd_replay import REDACTED, FixtureRecorder, FixtureReplayer, _canonical_body, _fixture_key, _redact_headers, report
+
+
+def _record(testcase, seq, path, response_body, method="GET", request_body="", elapsed=0.5):
+    return {
+        "testcase": testcase,
+        "seq": seq,
+        "method": method,
+        "path": path,
+        "request_body": request_body,
+        "status": 200,
+        "response_headers": {"Content-Type": "application/json"},
+        "response_body": response_body,
+        "elapsed": elapsed,
+    }
+
+
+def _write(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_fixture_key_canonical_json():
+    assert _fixture_key("post", "/q", '{"b": 1, "a": [1, 2]}') == _fixture_key("POST", "/q", '{"a":[1,2],"b":1}')
+    assert _fixture_key("GET", "/q", "not json") == ("GET", "/q", "not json")
+    assert _fixture_key("GET", "/q", "") == ("GET", "/q", "")
+
+
+def test_canonical_body_redacts_secrets():
+    body = json.loads(_canonical_body('{"userName": "admin", "userPasswd": "secret", "nested": [{"Password": "x"}]}'))
+    assert body == {"userName": "admin", "userPasswd": REDACTED, "nested": [{"Password": REDACTED}]}
+    body = json.loads(_canonical_body('{"jwttoken": "eyJ", "token": "abc", "Dcnm-Token": "def", "ok": 1}'))
+    assert body == {"jwttoken": REDACTED, "token": REDACTED, "Dcnm-Token": REDACTED, "ok": 1}
+
+
+def test_redact_headers():
+    headers = {"Set-Cookie": "AuthCookie=eyJ", "Authorization": "Bearer eyJ", "Content-Type": "application/json"}
+    assert _redact_headers(headers) == {"Set-Cookie": REDACTED, "Authorization": REDACTED, "Content-Type": "application/json"}
+
+
+def test_replay_in_recorded_order_then_repeat_last(tmp_path):
+    fixtures = tmp_path / "fixtures.jsonl"
+    _write(fixtures, [_record("t1", 2, "/q", "A2"), _record("t1", 1, "/q", "A1"), _record("t2", 1, "/q", "B1")])
+    replayer = FixtureReplayer(str(fixtures), "t1")
+    assert [replayer.lookup("GET", "/q", b"")["response_body"] for _ in range(4)] == ["A1", "A2", "A2", "A2"]
+    assert replayer.lookup("GET", "/missing", b"") is None
+    assert replayer.stats.summary()["calls"] == 5
+    assert replayer.stats.summary()["misses"] == 1
+
+
+def test_replay_matches_redacted_request_body(tmp_path):
+    fixtures = tmp_path / "fixtures.jsonl"
+    _write(fixtures, [_record("t1", 1, "/login", "ok", method="POST", request_body=_canonical_body('{"userPasswd": "secret"}'))])
+    replayer = FixtureReplayer(str(fixtures), "t1")
+    assert replayer.lookup("POST", "/login", b'{"userPasswd": "other"}')["response_body"] == "ok"
+
+
+def test_record_replaces_earlier_recording_of_testcase(tmp_path):
+    fixtures = tmp_path / "fixtures.jsonl"
+    _write(fixtures, [_record("t1", 1, "/q", "A1"), _record("t2", 1, "/q", "B1"), _record("t1", 2, "/q", "A2")])
+    FixtureRecorder("https://192.0.2.1", str(fixtures), "t1")
+    records = [json.loads(line) for line in fixtures.read_text(encoding="utf-8").splitlines()]
+    assert [record["response_body"] for record in records] == ["B1"]
+
+
+def test_record_missing_fixture_store(tmp_path):
+    fixtures = tmp_path / "fixtures.jsonl"
+    FixtureRecorder("https://192.0.2.1", str(fixtures), "t1")
+    assert not fixtures.exists()
+
+
+def test_report(tmp_path):
+    fixtures = tmp_path / "fixtures.jsonl"
+    _write(fixtures, [_record("t1", 1, "/q", "A1", elapsed=1.0), _record("t1", 2, "/q", "A2", elapsed=3.0), _record("t2", 1, "/q", "B1", elapsed=0.5)])
+    assert report(str(fixtures)) == {
+        "t1": {"calls": 2, "misses": 0, "latency_total": 4.0, "latency_mean": 2.0, "latency_max": 3.0},
+        "t2": {"calls": 1, "misses": 0, "latency_total": 0.5, "latency_mean": 0.5, "latency_max": 0.5},
+    }